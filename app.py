@@ -1,9 +1,10 @@
+import time
+_started = time.perf_counter()
+
 import streamlit as st
 from src.config import *
 from src.auth import login_ui
-from src.importer import importer_ui
-from src.view_main import render_main_page
-from src.view_audit import render_audit_page
+from src.startup import record_startup
 
 st.set_page_config(
     page_title="Excel DB App (Modularized)",
@@ -11,18 +12,45 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource(show_spinner=False)
+def bootstrap():
+    """プロセスごとに1回だけ行う初期化（保存先ファイル/ディレクトリの作成）"""
+    from src.storage import ensure_partitions, ensure_data_dir, load_dup_index
+    from src.audit import ensure_audit
+    ensure_data_dir()
+    ensure_partitions()
+    load_dup_index()  # 重複チェック用インデックス（なければ作成）
+    ensure_audit()
+
 # === ログイン ===
+# ログイン画面は pandas / openpyxl を読み込まずに表示する
 auth = login_ui()
+if not auth["ok"]:
+    # ログイン前はフォームだけを表示して終える（データ・ページの読み込みはログイン後）
+    # ログイン画面を表示した実行だけ記録する（ログイン後の再実行ごとには書かない）
+    st.info("サイドバーからログインしてください。")
+    record_startup(_started)
+    st.stop()
 IS_ADMIN = auth.get("role") == "admin"
 
+bootstrap()
+
 # === 管理者専用：Excel取り込み ===
-importer_ui(IS_ADMIN)
+if IS_ADMIN:
+    from src.importer import importer_ui
+    importer_ui(IS_ADMIN)
 
 # === ページ選択 ===
 st.sidebar.divider()
 
-page = st.sidebar.radio("ページ選択", ["📋 データ管理", "🪵 監査ログ"])
+# ページモジュールは選択されたときに初めて読み込む
+page = st.sidebar.radio("ページ選択", ["📋 データ管理", "🪵 監査ログ", "🔁 重複チェック"])
 if page == "📋 データ管理":
+    from src.view_main import render_main_page
     render_main_page(auth)
 elif page == "🪵 監査ログ":
-    render_audit_page(auth)
\ No newline at end of file
+    from src.view_audit import render_audit_page
+    render_audit_page(auth)
+elif page == "🔁 重複チェック":
+    from src.view_dup import render_dup_page
+    render_dup_page(auth)
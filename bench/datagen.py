@@ -0,0 +1,47 @@
+"""ベンチマーク用のダミーデータ生成
+
+pd.read_excel が返すのと同じ形（文字列は object、例会は数値と文字列の混在、
+精米歩合は割合と文字列の混在）の DataFrame を作る。
+"""
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+STYLES = ["本醸造", "特別本醸造", "純米", "特別純米", "吟醸", "純米吟醸", "大吟醸", "純米大吟醸", None]
+PREFS = ["北海道", "青森県", "秋田県", "山形県", "宮城県", "福島県", "新潟県", "長野県", "栃木県",
+         "埼玉県", "東京都", "石川県", "静岡県", "京都府", "兵庫県", "奈良県", "広島県", "山口県",
+         "高知県", "佐賀県"]
+
+
+def make_items(n: int, meetings: int | None = None, pending: int = 200, seed: int = 0) -> pd.DataFrame:
+    """n 行のダミーデータ（1例会あたり約10本、末尾 pending 行は登録承認待ち）"""
+    rnd = random.Random(seed)
+    meetings = meetings or max(1, n // 10)
+    members = [f"会員{i:02d}　{chr(0x3042 + i % 40)}" for i in range(40)]
+    kuramoto = [f"{chr(0x4E00 + i)}酒造" for i in range(500)]
+    brands = [f"銘柄{i}" for i in range(3000)]
+    base = datetime(2013, 4, 12)
+
+    rows = []
+    for i in range(n):
+        is_pending = i >= n - pending
+        mt = None if is_pending else 1 + i * meetings // max(1, n - pending)
+        seimai = rnd.choice([0.5, 0.55, 0.6, 0.7, "60", "麹米40％、掛米55％", None])
+        rows.append({
+            "id": i + 1,
+            "name": f"{rnd.choice(brands)}　{rnd.choice(['生', '原酒', '無濾過', ''])}".strip(),
+            "category": rnd.choice(STYLES),
+            "quantity": rnd.choice([0.0, float("nan")]),
+            "updated_at": base + timedelta(days=i // 10),
+            "会員氏名": rnd.choice(members),
+            "蔵元": rnd.choice(kuramoto),
+            "地域": rnd.choice(PREFS),
+            "精米歩合": seimai,
+            "備考": rnd.choice([None, "おすすめ", f"コメント{i}"]),
+            "例会": "登録承認待ち" if is_pending else (mt if i % 7 else f"第{mt}回"),
+            "例会日時": None if is_pending else base + timedelta(days=mt),
+        })
+    df = pd.DataFrame(rows)
+    df["例会日時"] = pd.to_datetime(df["例会日時"])
+    return df
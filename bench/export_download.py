@@ -0,0 +1,59 @@
+"""エクスポートボタンの生成処理の確認と計測
+
+    python -m bench.export_download --rows 20000
+
+一時ディレクトリにダミーデータを作り、export_buttons と同じ data 関数を呼んで、
+戻り値を Streamlit が st.download_button で使う変換（convert_data_to_bytes_and_infer_mime）に通す。
+変換できない型を返すとボタンを押したときに画面でエラーになるので、ここで失敗させる。
+ボタンごとに生成時間・サイズ・tracemalloc のピークメモリを表示する。
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from bench.datagen import make_items
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", type=int, default=20_000)
+    p.add_argument("--meetings", type=int, default=50)
+    a = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            from src import storage
+            from src.export import download_specs
+
+            storage.ensure_partitions()
+            storage.save_items(make_items(a.rows, meetings=a.meetings))
+            full_rows = sum(info["rows"] for info in storage.load_catalog()["partitions"].values())
+            view = storage.load_items([storage.PENDING_PARTITION])
+
+            print(f"{'button':<28} {'seconds':>8} {'MB':>7} {'peak MB':>8}  mime")
+            for df_view in (view, None):
+                for spec in download_specs(df_view, storage.iter_items, full_rows):
+                    tracemalloc.start()
+                    t0 = time.perf_counter()
+                    data, mime = convert_data_to_bytes_and_infer_mime(
+                        spec["data"](), TypeError(f"{spec['key']}: unsupported type")
+                    )
+                    dt = time.perf_counter() - t0
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    label = spec["label"] if df_view is not None else spec["label"] + " *"
+                    print(f"{label:<28} {dt:>8.2f} {len(data) / 1024 / 1024:>7.1f} "
+                          f"{peak / 1024 / 1024:>8.1f}  {mime}")
+            print("* 絞り込みなし（df_view=None）")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Streamlit の再実行レイテンシ計測（streamlit.testing.v1.AppTest で app.py を操作する）
+
+    python -m bench.rerun_latency --rows 20000 --sessions 1
+    python -m bench.rerun_latency --rows 20000 --sessions 8 --json out.json
+
+一時ディレクトリにダミーデータ（bench.datagen）と監査ログを作り、管理者として
+📋 データ管理ページで次の操作を行う。操作（＝ブラウザでの1回の再実行）ごとに
+実時間と tracemalloc のピークメモリを記録する。
+  ログイン → 会員氏名で絞り込み → グループ表示の切替 → 新規登録
+  → 例会番号の一括付与 → 一括削除
+--sessions N では N 個のセッションをスレッドで同時に動かす（Streamlit サーバーと同じく
+1プロセス内で並行実行）。このときピークメモリはプロセス全体の値になる。
+ファイルは一時ファイル経由で置き換えるので書きかけは読まないが、書き込みは排他されていないので、
+同時に書き換えると他のセッションの変更を上書きしうる（確認に失敗すると err 列に出る）。
+閲覧だけの同時実行を測るときは --read-only を付ける。
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from bench.datagen import make_items
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+# データを書き換える操作（--read-only では行わない）
+MUTATING = ("register item", "rerun after register", "assign:", "delete:")
+
+
+def prepare_data(rows: int, meetings: int, audit_rows: int) -> None:
+    """カレントディレクトリにデータ（パーティション・索引）と監査ログを作る"""
+    from src import storage
+    from src.audit import AUDIT_FILE
+    from src.xlsx_io import write_xlsx
+
+    storage.ensure_partitions()
+    storage.save_items(make_items(rows, meetings=meetings))
+    storage.load_dup_index()
+    logs = pd.DataFrame({
+        "ts": pd.Timestamp("2024-01-01"), "user": "admin", "action": "add",
+        "record_id": range(audit_rows), "name": "銘柄", "changed_fields": "",
+        "before_json": "{}", "after_json": "{}",
+    })
+    write_xlsx(logs, Path(AUDIT_FILE), "logs", op="audit_write")
+
+
+def _find(elements, label_prefix: str):
+    return next(e for e in elements if e.label.startswith(label_prefix))
+
+
+def _ids_from_labels(labels, n: int) -> list[int]:
+    return [int(re.match(r"\[id:(\d+)\]", s).group(1)) for s in labels[:n]]
+
+
+def _success(text: str):
+    """成功メッセージ text が出ているかの確認"""
+    def check(at):
+        return None if any(text in m.value for m in at.success) else f"no success message ({text})"
+    return check
+
+
+def scenario(session_no: int):
+    """(操作名, 操作前に行う入力, 実行後の確認) の列
+
+    入力は AppTest を受け取り、次の run() の前に呼ぶ。確認は run() の後に呼び、
+    問題があれば説明の文字列を返す（エラーとして数える）。
+    """
+    def login(at):
+        at.sidebar.text_input[0].input("admin")
+        at.sidebar.text_input[1].input("admin123")
+        at.sidebar.button[0].click()
+
+    def filter_member(at):
+        at.selectbox(key="search_member").select_index(1)
+
+    def clear_member(at):
+        at.selectbox(key="search_member").select_index(0)
+
+    def toggle_group(at):
+        at.toggle[0].set_value(False)
+
+    def register(at):
+        at.selectbox(key="member_select_existing").select_index(0)
+        tab = at.tabs[1]
+        _find(tab.text_input, "銘柄名").input(f"ベンチ酒{session_no}")
+        _find(tab.text_input, "蔵元").input("ベンチ酒造")
+        _find(tab.text_input, "精米歩合").input("55")
+        at.checkbox(key="force_dup").check()
+        _find(tab.button, "📤").click()
+
+    def assign_select(at):
+        ms = _find(at.multiselect, "対象レコード")
+        ms.set_value(_ids_from_labels(ms.options, 2))
+
+    def assign_apply(at):
+        _find(at.text_input, "付与する例会番号（例").input("9999")
+        _find(at.button, "🔧 適用").click()
+
+    picked = []  # 削除対象に選んだ id（削除後の確認用）
+
+    def delete_select(at):
+        ms = _find(at.multiselect, "削除対象")
+        picked[:] = _ids_from_labels(ms.options, 2)
+        ms.set_value(picked)
+
+    def delete_confirm(at):
+        _find(at.text_input, "確認のため").input("DELETE")
+
+    def delete_apply(at):
+        _find(at.button, "🗑️ 選択").click()
+
+    def deleted(at):
+        # 削除後は st.rerun() でメッセージが消えるので、候補から消えたかで確かめる
+        ms = _find(at.multiselect, "削除対象")
+        left = set(picked) & set(_ids_from_labels(ms.options, len(ms.options)))
+        return f"ids still listed after delete: {sorted(left)}" if left else None
+
+    return [
+        ("open (login form)", None, None),
+        ("login", login, None),
+        ("filter by member", filter_member, None),
+        ("clear filter", clear_member, None),
+        ("toggle group mode", toggle_group, None),
+        ("register item", register, _success("登録しました")),
+        ("rerun after register", None, None),
+        ("assign: select rows", assign_select, None),
+        ("assign: apply 例会", assign_apply, _success("件に適用しました")),
+        ("delete: select rows", delete_select, None),
+        ("delete: confirm", delete_confirm, None),
+        ("delete: apply", delete_apply, deleted),
+    ]
+
+
+def steps(session_no: int, read_only: bool):
+    return [s for s in scenario(session_no) if not (read_only and s[0].startswith(MUTATING))]
+
+
+def run_session(session_no: int, results: dict, errors: dict, trace: bool,
+                read_only: bool, lock: threading.Lock):
+    at = AppTest.from_file(str(APP_PATH), default_timeout=600)
+    for name, action, check in steps(session_no, read_only):
+        try:
+            if action:
+                action(at)
+            if trace:
+                tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            at.run()
+            wall = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        except Exception as e:  # 操作対象が見つからない等。計測は続ける
+            with lock:
+                errors[name].append(repr(e))
+            continue
+        with lock:
+            results[name].append((wall, peak))
+            if at.exception:
+                errors[name].append(at.exception[0].message)
+            elif check and (problem := check(at)):
+                errors[name].append(problem)
+
+
+def measure(sessions: int, trace: bool, read_only: bool = False) -> tuple[dict, dict]:
+    results, errors = defaultdict(list), defaultdict(list)
+    lock = threading.Lock()
+    if trace:
+        tracemalloc.start()
+    threads = [
+        threading.Thread(target=run_session, args=(i, results, errors, trace, read_only, lock))
+        for i in range(sessions)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if trace:
+        tracemalloc.stop()
+    return results, errors
+
+
+def summarize(results: dict, errors: dict, read_only: bool = False) -> list[dict]:
+    rows = []
+    for name, *_ in steps(0, read_only):
+        walls = sorted(w for w, _ in results.get(name, []))
+        peaks = [p for _, p in results.get(name, [])]
+        if not walls:
+            rows.append({"interaction": name, "n": 0, "errors": len(errors.get(name, []))})
+            continue
+        rows.append({
+            "interaction": name,
+            "n": len(walls),
+            "p50_ms": statistics.median(walls) * 1000,
+            "p95_ms": walls[min(len(walls) - 1, int(len(walls) * 0.95))] * 1000,
+            "max_ms": walls[-1] * 1000,
+            "peak_mb": max(peaks) / 1024 / 1024 if any(peaks) else None,
+            "errors": len(errors.get(name, [])),
+        })
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", type=int, default=20_000, help="ダミーデータの行数")
+    p.add_argument("--meetings", type=int, default=50, help="例会の数（パーティション数）")
+    p.add_argument("--audit-rows", type=int, default=5_000, help="監査ログの既存行数")
+    p.add_argument("--sessions", type=int, default=1, help="同時に動かすセッション数")
+    p.add_argument("--read-only", action="store_true", help="登録・例会付与・削除を行わない（閲覧操作だけ測る）")
+    p.add_argument("--no-memory", action="store_true", help="tracemalloc を使わない（時間だけ測る）")
+    p.add_argument("--json", help="結果を JSON で保存するパス（リリース間の比較用）")
+    a = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            prepare_data(a.rows, a.meetings, a.audit_rows)
+            results, errors = measure(a.sessions, trace=not a.no_memory, read_only=a.read_only)
+        finally:
+            os.chdir(cwd)
+
+    rows = summarize(results, errors, a.read_only)
+    print(f"rows={a.rows} meetings={a.meetings} audit_rows={a.audit_rows} sessions={a.sessions}")
+    print(f"{'interaction':<22} {'n':>3} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'peak MB':>8} {'err':>4}")
+    for r in rows:
+        if not r["n"]:
+            print(f"{r['interaction']:<22} {0:>3} {'-':>9} {'-':>9} {'-':>9} {'-':>8} {r['errors']:>4}")
+            continue
+        peak = "-" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}"
+        print(f"{r['interaction']:<22} {r['n']:>3} {r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f} "
+              f"{r['max_ms']:>9.0f} {peak:>8} {r['errors']:>4}")
+    for name, errs in errors.items():
+        for e in sorted(set(errs)):
+            print(f"  ! {name}: {e}")
+
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(a), "results": rows}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""読み込み直後（推論された型）とスキーマ適用後のメモリ使用量の比較
+
+    python -m bench.schema_memory --rows 100000
+"""
+import argparse
+import time
+
+from bench.datagen import make_items
+from src.storage import apply_schema
+
+
+def mb(df) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    a = p.parse_args()
+
+    print(f"{'rows':>8} {'inferred MB':>12} {'typed MB':>10} {'saved MB':>9} {'ratio':>6} {'apply s':>8}")
+    for n in a.rows:
+        raw = make_items(n)
+        t0 = time.perf_counter()
+        typed = apply_schema(raw)
+        dt = time.perf_counter() - t0
+        print(f"{n:>8} {mb(raw):>12.1f} {mb(typed):>10.1f} {mb(raw) - mb(typed):>9.1f} "
+              f"{mb(typed) / mb(raw):>6.2f} {dt:>8.2f}")
+    # 画面の1回の再実行では load_items の結果に加えて表示用のコピーを持つので、
+    # 1ワーカー（セッション）あたりの削減量はおおむね saved MB × 2 になる。
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""xlsx 読み書きエンジンの比較（storage / audit / importer の3モジュール）
+
+    python -m bench.xlsx_engines --rows 20000
+
+一時ディレクトリ内で、エンジンの組み合わせごとに次の時間を測る。
+- storage : save_items（全パーティション書き出し）/ load_items（全件読み込み）
+- audit   : append_audit 1回（監査ログ全体の読み込み＋書き出し）
+- importer: アップロードされた xlsx のシート一覧＋読み込み
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from bench.datagen import make_items
+from src import config
+from src.xlsx_io import READ_ENGINES, WRITE_ENGINES, available, write_xlsx
+
+
+def timed(func) -> float:
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def run(rows: int, meetings: int, read_engine: str, write_engine: str) -> dict:
+    import pandas as pd
+    from src import storage
+    from src.audit import append_audit, AUDIT_FILE
+    from src.xlsx_io import open_xlsx
+
+    for op in config.XLSX_ENGINES:
+        config.XLSX_ENGINES[op] = read_engine if op.endswith("_read") else write_engine
+
+    df = make_items(rows, meetings=meetings)
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            storage.ensure_partitions()
+            result = {
+                "items_write": timed(lambda: storage.save_items(df)),
+                "items_read": timed(lambda: storage.load_items()),
+            }
+
+            logs = pd.DataFrame({
+                "ts": pd.Timestamp("2024-01-01"), "user": "admin", "action": "update_meeting",
+                "record_id": range(rows), "name": "銘柄", "changed_fields": "例会",
+                "before_json": "{'例会': None}", "after_json": "{'例会': '8'}",
+            })
+            write_xlsx(logs, Path(AUDIT_FILE), "logs", op="audit_write")
+            result["audit_append"] = timed(lambda: append_audit("bench", "admin", {"id": 1}, {"id": 1}))
+
+            upload = io.BytesIO()
+            write_xlsx(df, upload, config.SHEET_NAME, op="export_write")
+            def import_read():
+                upload.seek(0)
+                xls = open_xlsx(upload, op="import_read")
+                pd.read_excel(xls, sheet_name=xls.sheet_names[0])
+            result["import_read"] = timed(import_read)
+        finally:
+            os.chdir(cwd)
+    return result
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", type=int, default=20_000)
+    p.add_argument("--meetings", type=int, default=50)
+    a = p.parse_args()
+
+    readers = [e for e in READ_ENGINES if available(e)]
+    writers = [e for e in WRITE_ENGINES if available(e)]
+    print(f"rows={a.rows} meetings={a.meetings}  (seconds)")
+    print(f"{'read':>10} {'write':>10} {'items_write':>12} {'items_read':>11} {'audit_append':>13} {'import_read':>12}")
+    for r in readers:
+        for w in writers:
+            res = run(a.rows, a.meetings, r, w)
+            print(f"{r:>10} {w:>10} {res['items_write']:>12.2f} {res['items_read']:>11.2f} "
+                  f"{res['audit_append']:>13.2f} {res['import_read']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
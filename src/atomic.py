@@ -0,0 +1,23 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(path) -> Iterator[Path]:
+    """path の代わりに同じディレクトリの一時ファイルへ書かせ、書き終えたら os.replace で置き換える
+
+    他のセッションが同時に読んでも、書きかけのファイルは見えない（置き換えの前か後の内容になる）。
+    途中で失敗したら一時ファイルを消し、元のファイルはそのまま残す。
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield Path(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
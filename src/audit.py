@@ -2,6 +2,7 @@ from datetime import datetime
 from pathlib import Path
 import pandas as pd
 from .config import AUDIT_FILE
+from .xlsx_io import read_xlsx, write_xlsx
 
 def ensure_audit():
     """監査ログファイルがなければ作成"""
@@ -10,25 +11,20 @@ def ensure_audit():
             "ts", "user", "action", "record_id", "name",
             "changed_fields", "before_json", "after_json"
         ])
-        with pd.ExcelWriter(AUDIT_FILE, engine="openpyxl") as w:
-            df.to_excel(w, index=False, sheet_name="logs")
+        write_xlsx(df, AUDIT_FILE, "logs", op="audit_write")
 
 def _read_audit() -> pd.DataFrame:
     """監査ログを読み込み"""
     ensure_audit()
     try:
-        return pd.read_excel(AUDIT_FILE, sheet_name="logs", engine="openpyxl")
+        return read_xlsx(AUDIT_FILE, "logs", op="audit_read")
     except Exception:
         return pd.DataFrame(columns=[
             "ts", "user", "action", "record_id", "name",
             "changed_fields", "before_json", "after_json"
         ])
 
-def append_audit(action: str, user: str, before: dict|None, after: dict|None):
-    """監査ログを追記"""
-    ensure_audit()
-    df = _read_audit()
-
+def _audit_row(action: str, user: str, before: dict|None, after: dict|None) -> dict:
     rec_id = (after or before or {}).get("id", "")
     name = (after or before or {}).get("name", "")
     changed = []
@@ -36,7 +32,7 @@ def append_audit(action: str, user: str, before: dict|None, after: dict|None):
         keys = set(before.keys()) | set(after.keys())
         changed = [k for k in keys if str(before.get(k)) != str(after.get(k))]
 
-    row = {
+    return {
         "ts": datetime.now(),
         "user": user or "-",
         "action": action,
@@ -47,6 +43,16 @@ def append_audit(action: str, user: str, before: dict|None, after: dict|None):
         "after_json": str(after or {}),
     }
 
-    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    with pd.ExcelWriter(AUDIT_FILE, engine="openpyxl") as w:
-        df.to_excel(w, index=False, sheet_name="logs")
+def append_audit_many(action: str, user: str, changes: list[tuple[dict|None, dict|None]]):
+    """監査ログをまとめて追記（(before, after) の組ごとに1行。読み書きは1回だけ）"""
+    if not changes:
+        return
+    ensure_audit()
+    df = _read_audit()
+    rows = pd.DataFrame([_audit_row(action, user, b, a) for b, a in changes])
+    df = pd.concat([df, rows], ignore_index=True)
+    write_xlsx(df, AUDIT_FILE, "logs", op="audit_write")
+
+def append_audit(action: str, user: str, before: dict|None, after: dict|None):
+    """監査ログを追記"""
+    append_audit_many(action, user, [(before, after)])
@@ -0,0 +1,158 @@
+import io
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from .audit import append_audit_many
+from .config import PENDING_PARTITION
+from .normalize import normalize_member_name, dup_key, PENDING_LABEL
+from .storage import (
+    append_items, next_item_id, bump_member_history_many,
+    load_dup_index, find_duplicates,
+)
+
+# 入力欄の見出し → 保存する列名
+BULK_COLUMNS = {
+    "会員氏名": "会員氏名",
+    "銘柄名": "name",
+    "蔵元": "蔵元",
+    "地域": "地域",
+    "種別": "category",
+    "精米歩合": "精米歩合",
+    "備考": "備考",
+}
+SEIMAI_PATTERN = r"[0-9]+(\.[0-9]+)?"
+
+
+def empty_grid(n_rows: int = 5) -> pd.DataFrame:
+    return pd.DataFrame("", index=range(n_rows), columns=list(BULK_COLUMNS))
+
+
+def parse_pasted(text: str) -> pd.DataFrame:
+    """貼り付けた表（Excel のコピーはタブ区切り、CSV はカンマ区切り）を入力欄の形にする
+
+    1行目は見出し。見出しは入力欄と同じ名前（会員氏名・銘柄名…）か保存列名（name・category）。
+    """
+    df = pd.read_csv(io.StringIO(text.strip()), sep=None, engine="python",
+                     dtype=str, keep_default_na=False)
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.rename(columns={v: k for k, v in BULK_COLUMNS.items() if v != k})
+    known = [c for c in BULK_COLUMNS if c in df.columns]
+    if not known:
+        raise ValueError("見出し行に 会員氏名・銘柄名 などの列名が見つかりません。")
+    return df.reindex(columns=list(BULK_COLUMNS), fill_value="")
+
+
+def validate_rows(grid: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """入力欄の全行をまとめて整形・検証する
+
+    戻り値は（空行を除いた行, 行ごとのエラー文。問題なければ ""）。
+    """
+    rows = grid.reindex(columns=list(BULK_COLUMNS)).fillna("").astype(str)
+    rows = rows.apply(lambda col: col.str.strip())
+    rows = rows[(rows != "").any(axis=1)].copy()
+    rows["会員氏名"] = rows["会員氏名"].map(normalize_member_name)
+
+    missing = (rows["会員氏名"] == "") | (rows["銘柄名"] == "")
+    bad_seimai = (rows["精米歩合"] != "") & ~rows["精米歩合"].str.fullmatch(SEIMAI_PATTERN)
+
+    errors = pd.Series("", index=rows.index)
+    errors[missing] += "会員氏名と銘柄名は必須です。"
+    errors[bad_seimai] += "精米歩合は半角数字（小数点可）のみです。"
+    return rows, errors
+
+
+def find_bulk_duplicates(rows: pd.DataFrame) -> pd.Series:
+    """行ごとの重複の説明（既存データ：同じ会員か登録承認待ちに同じ銘柄／この入力の中での重複）"""
+    index = load_dup_index()  # 索引は1回だけ読む
+    notes = pd.Series("", index=rows.index)
+    for i, r in rows.iterrows():
+        ids = find_duplicates(r["銘柄名"], r["蔵元"], member=r["会員氏名"],
+                              partition=PENDING_PARTITION, index=index)
+        if ids:
+            notes[i] = "既存 id " + ", ".join(map(str, ids))
+
+    keys = [dup_key(n, k) + "|" + m for n, k, m in zip(rows["銘柄名"], rows["蔵元"], rows["会員氏名"])]
+    in_batch = pd.Series(keys, index=rows.index).duplicated(keep=False)
+    notes[in_batch] = notes[in_batch].map(lambda s: f"{s}／入力内で重複" if s else "入力内で重複")
+    return notes
+
+
+def build_items(rows: pd.DataFrame, start_id: int) -> pd.DataFrame:
+    """検証済みの行 → 保存する行（id は start_id から連番で割り当て、例会は登録承認待ち）"""
+    items = rows.rename(columns=BULK_COLUMNS).reset_index(drop=True)
+    items.insert(0, "id", range(start_id, start_id + len(items)))
+    items["updated_at"] = datetime.now()
+    items["例会"] = PENDING_LABEL
+    return items
+
+
+def bulk_entry_form(auth) -> None:
+    """📝 まとめて登録（表に複数行を入力 → 一括で検証・保存）"""
+    # 入力欄を作り直すたびに番号を変える（貼り付けの反映・登録後のクリア）
+    version = st.session_state.setdefault("bulk_grid_version", 0)
+    if msg := st.session_state.pop("bulk_done", None):
+        st.success(msg)
+    grid_init = st.session_state.get("bulk_grid_init", empty_grid())
+
+    with st.expander("📋 Excel / CSV から貼り付け"):
+        text = st.text_area("1行目に見出し（会員氏名・銘柄名・蔵元・地域・種別・精米歩合・備考）を含めて貼り付け",
+                            height=150, key=f"bulk_paste_{version}")
+        if st.button("表に取り込む", disabled=not text.strip()):
+            try:
+                st.session_state["bulk_grid_init"] = parse_pasted(text)
+            except Exception as e:
+                st.error(f"⚠️ 読み取れませんでした：{e}")
+            else:
+                st.session_state["bulk_grid_version"] = version + 1
+                st.rerun()
+
+    with st.form("bulk_entry_form"):
+        # フォームの中なので、セルを編集しても送信するまで再実行しない
+        grid = st.data_editor(
+            grid_init,
+            num_rows="dynamic",
+            width="stretch",
+            hide_index=True,
+            column_config={c: st.column_config.TextColumn(c) for c in BULK_COLUMNS},
+            key=f"bulk_grid_{version}",
+        )
+        force_dup = st.checkbox("重複の可能性があっても登録する", value=False, key="bulk_force_dup")
+        submitted = st.form_submit_button("📤 まとめて登録する")
+
+    if not submitted:
+        return
+
+    rows, errors = validate_rows(grid)
+    if rows.empty:
+        st.warning("⚠️ 登録する行がありません。")
+        return
+    if (errors != "").any():
+        bad = rows.assign(エラー=errors)[errors != ""]
+        bad.index = bad.index + 1
+        st.error(f"⚠️ {len(bad)}行に問題があります。修正してからもう一度送信してください。")
+        st.dataframe(bad[["エラー", "会員氏名", "銘柄名", "精米歩合"]], width="stretch")
+        return
+
+    dups = find_bulk_duplicates(rows)
+    if (dups != "").any() and not force_dup:
+        hit = rows.assign(重複=dups)[dups != ""]
+        hit.index = hit.index + 1
+        st.warning(f"⚠️ 重複の可能性がある行が {len(hit)}行 あります。重複でなければ「重複の可能性があっても登録する」にチェックして再送信してください。")
+        st.dataframe(hit[["重複", "会員氏名", "銘柄名", "蔵元"]], width="stretch")
+        return
+
+    # === 登録処理 ===（id をまとめて確保し、データ・頻度・監査ログをそれぞれ1回で書く）
+    items = build_items(rows, next_item_id())
+    append_items(items)
+    bump_member_history_many(items["会員氏名"])
+    append_audit_many("add", user=auth.get("user"),
+                      changes=[(None, r) for r in items.to_dict("records")])
+
+    st.cache_data.clear()
+    # 入力欄を空にして表示し直す
+    st.session_state["bulk_grid_version"] = version + 1
+    st.session_state.pop("bulk_grid_init", None)
+    st.session_state["bulk_done"] = f"✅ {len(items)}件を登録しました！（id {items['id'].iloc[0]}〜{items['id'].iloc[-1]}）"
+    st.rerun()
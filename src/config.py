@@ -5,11 +5,59 @@ DATA_FILE = Path("data.xlsx")
 AUDIT_FILE = Path("audit_log.xlsx")
 SHEET_NAME = "items"
 
+# 例会ごとのパーティション保存（初回起動時に DATA_FILE から移行）
+PARTITION_DIR = Path("data_parts")
+CATALOG_FILE = PARTITION_DIR / "catalog.json"
+PENDING_PARTITION = "pending"   # 例会未設定（登録承認待ち）
+OTHER_PARTITION = "other"       # 例会番号として解釈できない値
+ACTIVE_MEETINGS = 3             # 既定で読み込む直近の例会数
+DUP_INDEX_FILE = PARTITION_DIR / "dup_index.json"  # 重複チェック用インデックス
+
+# xlsx の読み書きエンジン（操作ごと）
+#   読み込み: "calamine"（python-calamine が入っていれば最速）/ "openpyxl"
+#   書き出し: "xlsxwriter" / "openpyxl"（write_only）
+#   "auto" はインストールされている速いほうを使う
+XLSX_ENGINES = {
+    "items_read": "auto",
+    "items_write": "auto",
+    "audit_read": "auto",
+    "audit_write": "auto",
+    "import_read": "auto",
+    "export_write": "auto",
+}
+
+# 補助データ（選択履歴・計測ログなど）の保存先
+DATA_DIR = Path(".data")
+STARTUP_LOG_FILE = DATA_DIR / "startup_times.csv"
+
 # スキーマ
 CORE_FIELDS = ["id", "name", "category", "quantity", "updated_at"]
 EXTRA_FIELDS = ["会員氏名", "蔵元", "地域", "精米歩合", "備考", "例会", "例会日時"]
 TARGET_FIELDS = CORE_FIELDS + EXTRA_FIELDS
 
+# 列ごとのメモリ上の型（読み込み・取り込み時に storage.apply_schema で揃える）
+# - 種類の少ない文字列は category（会員氏名・蔵元・地域・種別・例会）
+# - id / quantity は欠損を許す整数（Int64）
+# - 例会は正規化したラベル（例会番号の数字文字列、その他の値はそのまま、登録承認待ちは欠損）
+# - 精米歩合は入力された値のまま（0.55 / "55" / "麹米40％、掛米55％" などが混在するので category。RAW_VALUE_FIELDS）。
+#   表示・並べ替え用の割合は storage.seimai_ratios で求める（保存はしない）
+ITEM_SCHEMA = {
+    "id": "Int64",
+    "name": "object",
+    "category": "category",
+    "quantity": "Int64",
+    "updated_at": "datetime64[ns]",
+    "会員氏名": "category",
+    "蔵元": "category",
+    "地域": "category",
+    "精米歩合": "category",
+    "備考": "object",
+    "例会": "category",
+    "例会日時": "datetime64[ns]",
+}
+# category の列のうち、値を文字列にそろえず入力されたまま持つ列（数値と文字列が混在する）
+RAW_VALUE_FIELDS = {"精米歩合"}
+
 # 権限ロール名
 ADMIN_ROLE = "admin"
 USER_ROLE = "user"
@@ -0,0 +1,147 @@
+import csv
+import io
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+import streamlit as st
+
+from .config import SHEET_NAME, TARGET_FIELDS
+from .normalize import normalize_member_name, meeting_label
+from .xlsx_io import CHUNK_ROWS, iter_rows, write_xlsx as _write_xlsx, write_xlsx_parts
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# ダウンロード用ファイルをメモリ上に置く上限（超えるとディスク上の一時ファイルに書く）
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def iter_csv(df: pd.DataFrame, chunk_size: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """CSV を chunk_size 行ごとのバイト列として順に返す（Excel で開けるよう BOM 付き UTF-8）"""
+    return iter_csv_parts([df], list(df.columns), chunk_size)
+
+
+def iter_csv_parts(parts: Iterable[pd.DataFrame], columns: list, chunk_size: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """同じ列の DataFrame を順に1つの CSV として返す（見出しは最初の1回だけ）"""
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(columns)
+    yield buf.getvalue().encode("utf-8-sig")
+    buf.seek(0)
+    buf.truncate()
+
+    rows = (row for df in parts for row in iter_rows(df[columns], chunk_size))
+    for i, row in enumerate(rows, start=1):
+        w.writerow(["" if v is None else v for v in row])
+        if i % chunk_size == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def write_xlsx(df: pd.DataFrame, out, chunk_size: int = CHUNK_ROWS) -> None:
+    """行を逐次書き出す（openpyxl write_only / xlsxwriter constant_memory。out はパスまたはファイルオブジェクト）"""
+    _write_xlsx(df, out, SHEET_NAME, op="export_write", chunk_size=chunk_size)
+
+
+def filter_items(df: pd.DataFrame, member: str | None = None, meeting: str | None = None) -> pd.DataFrame:
+    """画面と同じ条件（会員氏名は正規化して比較、例会は表示ラベルで比較）で絞り込む"""
+    mask = pd.Series(True, index=df.index)
+    if member:
+        target = normalize_member_name(member)
+        mask &= df["会員氏名"].astype(str).map(normalize_member_name) == target
+    if meeting:
+        mask &= df["例会"].astype(object).map(meeting_label) == meeting_label(meeting)
+    return df[mask]
+
+
+def export_items(path, member: str | None = None, meeting: str | None = None,
+                 df: pd.DataFrame | None = None, chunk_size: int = CHUNK_ROWS) -> int:
+    """画面を使わずにエクスポートする（拡張子 .csv / .xlsx で形式を判定）。書き出した行数を返す"""
+    if df is None:
+        from .storage import load_items, partition_key
+        # 例会を指定したときはそのパーティションだけ読む
+        df = load_items([partition_key(meeting)] if meeting else None)
+    out = filter_items(df, member, meeting)[TARGET_FIELDS]
+
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, "wb") as f:
+            for part in iter_csv(out, chunk_size):
+                f.write(part)
+    elif path.suffix.lower() == ".xlsx":
+        write_xlsx(out, path, chunk_size)
+    else:
+        raise ValueError(f"未対応の形式です：{path.suffix}")
+    return len(out)
+
+
+def _spooled_bytes(write) -> bytes:
+    """write(f) で一時ファイルに書いてから中身を bytes で返す
+
+    st.download_button が受け付けるのは bytes / BytesIO などで、一時ファイルのオブジェクトは渡せない。
+    書き出し中の作業領域は SPOOL_MAX_BYTES を超えるとディスクに移るが、返す bytes はファイル全体になる。
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as f:
+        write(f)
+        f.seek(0)
+        return f.read()
+
+
+def _csv_bytes(parts: Iterable[pd.DataFrame]) -> bytes:
+    def write(f):
+        for chunk in iter_csv_parts(parts, TARGET_FIELDS):
+            f.write(chunk)
+    return _spooled_bytes(write)
+
+
+def _xlsx_bytes(parts: Iterable[pd.DataFrame]) -> bytes:
+    return _spooled_bytes(lambda f: write_xlsx_parts(parts, TARGET_FIELDS, f, SHEET_NAME, op="export_write"))
+
+
+def download_specs(df_view: pd.DataFrame | None, iter_full, full_rows: int) -> list[dict]:
+    """エクスポート用ダウンロードボタンの引数（data はボタンが押されたときに呼ばれる関数）
+
+    全件は iter_full()（パーティションごとの DataFrame を返す）で1つずつ読みながら書く。
+    df_view=None（絞り込みなし）は絞り込み結果も全件。
+    """
+    stamp = datetime.now().strftime("%Y%m%d")
+    if df_view is None:
+        view_rows, view_parts = full_rows, iter_full
+    else:
+        view = df_view[TARGET_FIELDS]
+        view_rows, view_parts = len(view), lambda: [view]
+
+    return [
+        dict(label=f"絞り込み結果 CSV（{view_rows}件）", data=lambda: _csv_bytes(view_parts()),
+             file_name=f"items_filtered_{stamp}.csv", mime="text/csv", key="export_view_csv"),
+        dict(label=f"絞り込み結果 Excel（{view_rows}件）", data=lambda: _xlsx_bytes(view_parts()),
+             file_name=f"items_filtered_{stamp}.xlsx", mime=XLSX_MIME, key="export_view_xlsx"),
+        dict(label=f"全件 CSV（{full_rows}件）", data=lambda: _csv_bytes(iter_full()),
+             file_name=f"items_all_{stamp}.csv", mime="text/csv", key="export_all_csv"),
+        dict(label=f"全件 Excel（{full_rows}件）", data=lambda: _xlsx_bytes(iter_full()),
+             file_name=f"items_all_{stamp}.xlsx", mime=XLSX_MIME, key="export_all_xlsx"),
+    ]
+
+
+def export_buttons(df_view: pd.DataFrame | None, iter_full, full_rows: int) -> None:
+    """絞り込み結果・全件のダウンロードボタン（ファイルはボタンが押されたときに初めて生成する）"""
+    st.markdown("**⬇️ エクスポート**")
+    for col, spec in zip(st.columns(4), download_specs(df_view, iter_full, full_rows)):
+        with col:
+            st.download_button(**spec, on_click="ignore")
+
+
+if __name__ == "__main__":
+    # 例：python -m src.export out.xlsx --member "山田 太郎" --meeting 8
+    import argparse
+    p = argparse.ArgumentParser(description="データをCSV/xlsxにエクスポート")
+    p.add_argument("path")
+    p.add_argument("--member")
+    p.add_argument("--meeting")
+    a = p.parse_args()
+    n = export_items(a.path, member=a.member, meeting=a.meeting)
+    print(f"{n}件を書き出しました：{a.path}")
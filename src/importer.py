@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from .storage import save_items
+from .storage import save_items, apply_schema
+from .xlsx_io import open_xlsx
 from .config import DATA_FILE, SHEET_NAME, STYLE_CANDIDATES
 from datetime import datetime
 
@@ -22,9 +23,9 @@ def importer_ui(is_admin: bool):
         return
 
     try:
-        xls = pd.ExcelFile(uploaded, engine="openpyxl")
+        xls = open_xlsx(uploaded, op="import_read")
         sheet = st.sidebar.selectbox("読み込むシート", options=xls.sheet_names, index=0)
-        df_raw = pd.read_excel(xls, sheet_name=sheet, engine="openpyxl")
+        df_raw = pd.read_excel(xls, sheet_name=sheet)
         st.sidebar.success(f"シート '{sheet}' を読み込みました。")
 
         with st.expander("🔎 生データプレビュー（先頭20行）", expanded=False):
@@ -52,7 +53,7 @@ def importer_ui(is_admin: bool):
             default=[c for c in STYLE_CANDIDATES if c in df_raw.columns]
         )
 
-        if st.button("✅ この対応で取り込む（data.xlsxに保存）", type="primary"):
+        if st.button("✅ この対応で取り込む（既存データを置き換えて保存）", type="primary"):
             df_norm = normalize_df(df_raw, mapping, style_cols)
             save_items(df_norm)
             st.success("取り込み＆保存が完了しました。")
@@ -114,4 +115,4 @@ def normalize_df(df_raw: pd.DataFrame, mapping: dict, style_cols: list[str]) ->
             return None
         out["category"] = df_raw.apply(pick_style, axis=1)
 
-    return out
+    return apply_schema(out)
@@ -0,0 +1,41 @@
+import re
+import unicodedata
+
+PENDING_LABEL = "登録承認待ち"
+
+def normalize_member_name(s: str) -> str:
+    if not s:
+        return s
+    s = unicodedata.normalize("NFKC", s)   # 全角→半角など
+    s = s.strip()
+    s = re.sub(r"\s+", " ", s)             # 連続空白を単一スペースに
+    return s
+
+def meeting_label(v: object) -> str:
+    """例会の値を表示用ラベルに整形（未設定は「登録承認待ち」）"""
+    s = str(v).strip()
+    if s in ["", "nan", "None", "<NA>"]:
+        return PENDING_LABEL
+    if "第" in s and "回" in s:
+        return s
+    try:
+        n = int(float(s))
+        return f"第{n}回"
+    except Exception:
+        return s
+
+def dup_key(name: object, kuramoto: object) -> str:
+    """重複判定用の自然キー（銘柄名＋蔵元）
+
+    NFKC 正規化・大文字小文字の無視・空白の除去を行い、
+    「獺祭　島耕作」と「獺祭 島耕作」などを同じキーにする。銘柄名が空なら ""。
+    """
+    def norm(v: object) -> str:
+        s = "" if v is None else str(v)
+        if s in ("nan", "None", "<NA>"):
+            return ""
+        s = unicodedata.normalize("NFKC", s).casefold()
+        return re.sub(r"\s+", "", s)
+
+    n = norm(name)
+    return f"{n}|{norm(kuramoto)}" if n else ""
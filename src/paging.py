@@ -0,0 +1,76 @@
+import math
+import streamlit as st
+import pandas as pd
+
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+def paginate(df: pd.DataFrame, page: int, page_size: int,
+             sort_col: str | None = None, ascending: bool = True) -> tuple[pd.DataFrame, int]:
+    """並べ替え → 該当ページだけを切り出す（ブラウザへ送るのはこの範囲だけ）
+
+    戻り値は（ページの DataFrame, 総ページ数）。page は 1 始まりで範囲外は丸める。
+    """
+    n_pages = max(1, math.ceil(len(df) / page_size))
+    page = min(max(1, page), n_pages)
+    if sort_col and sort_col in df.columns:
+        df = df.sort_values(sort_col, ascending=ascending, kind="stable", na_position="last")
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], n_pages
+
+
+def pager(key: str, total_rows: int, sort_options: list[str]) -> tuple[int, int, str | None, bool]:
+    """ページサイズ・ページ番号・並べ替え列の入力欄（総ページ数が変わるとページは1に戻る）"""
+    c1, c2, c3, c4 = st.columns([1, 1, 1.5, 1])
+    with c1:
+        page_size = st.selectbox("表示件数", PAGE_SIZES, index=1, key=f"{key}_size")
+    n_pages = max(1, math.ceil(total_rows / page_size))
+    with c2:
+        page = st.number_input(f"ページ（全{n_pages}）", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page_{n_pages}")
+    with c3:
+        sort_col = st.selectbox("並べ替え", ["(登録順)"] + sort_options, index=0, key=f"{key}_sort")
+    with c4:
+        ascending = st.radio("順序", ["昇順", "降順"], horizontal=True, key=f"{key}_order") == "昇順"
+    return int(page), int(page_size), (None if sort_col == "(登録順)" else sort_col), ascending
+
+
+def paged_multiselect(label: str, options: pd.Series, key: str,
+                      page_size: int = 50, searchable: bool = True) -> list:
+    """大量の候補から選ぶための複数選択（検索＋ページ送り）
+
+    options は index=値、values=表示ラベルの Series。
+    表示中のページの候補だけをウィジェットに渡し、ページをまたいだ選択は session_state に保持する。
+    """
+    state_key = f"{key}_selected"
+    selected = [v for v in st.session_state.get(state_key, []) if v in options.index]
+
+    shown = options
+    if searchable:
+        q = st.text_input(f"🔎 {label}を検索", "", key=f"{key}_q")
+        if q:
+            shown = options[options.astype(str).str.contains(q, case=False, regex=False, na=False)]
+
+    n_pages = max(1, math.ceil(len(shown) / page_size))
+    if n_pages > 1:
+        page = st.number_input(f"候補ページ（全{n_pages}・{len(shown)}件）", min_value=1, max_value=n_pages,
+                               value=1, step=1, key=f"{key}_page_{n_pages}")
+    else:
+        page = 1
+    page_opts = shown.iloc[(int(page) - 1) * page_size:int(page) * page_size]
+
+    on_page = [v for v in selected if v in page_opts.index]
+    picked = st.multiselect(
+        label,
+        options=page_opts.index.tolist(),
+        default=on_page,
+        format_func=lambda v: str(page_opts.get(v, v)),
+        # 候補が変わったら（検索・削除後など）ウィジェットを作り直して default を反映させる
+        key=f"{key}_ms_{hash(tuple(page_opts.index))}",
+    )
+    # 表示中ページの選択だけを入れ替え、他ページの選択は残す
+    selected = [v for v in selected if v not in page_opts.index] + list(picked)
+    st.session_state[state_key] = selected
+
+    if len(selected) > len(picked):
+        st.caption(f"選択中：{len(selected)}件（他のページを含む）")
+    return selected
@@ -0,0 +1,34 @@
+import csv
+import logging
+import time
+from datetime import datetime
+from .config import DATA_DIR, STARTUP_LOG_FILE
+
+logger = logging.getLogger(__name__)
+
+# プロセス内で最初の実行（コールドスタート）かどうか
+_cold = True
+
+def record_startup(started: float, phase: str = "login_form") -> float:
+    """started（perf_counter値）からの経過秒数を記録して返す
+
+    プロセス内の初回実行は "cold"、以降の再実行は "warm" として
+    STARTUP_LOG_FILE（CSV）に追記する。リリース間の比較用。
+    """
+    global _cold
+    elapsed = time.perf_counter() - started
+    kind = "cold" if _cold else "warm"
+    _cold = False
+
+    logger.info("startup %s (%s): %.3fs", phase, kind, elapsed)
+    try:
+        DATA_DIR.mkdir(exist_ok=True)
+        new_file = not STARTUP_LOG_FILE.exists()
+        with open(STARTUP_LOG_FILE, "a", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            if new_file:
+                w.writerow(["ts", "phase", "kind", "seconds"])
+            w.writerow([datetime.now().isoformat(timespec="seconds"), phase, kind, f"{elapsed:.4f}"])
+    except OSError:
+        pass  # 計測の失敗で画面を止めない
+    return elapsed
@@ -1,42 +1,397 @@
 from datetime import datetime
 from pathlib import Path
+from collections import Counter
+import json
+import re
+import unicodedata
+import numpy as np
 import pandas as pd
-from typing import Tuple
-from .config import DATA_FILE, SHEET_NAME, TARGET_FIELDS
+from typing import Iterator, Tuple
+from .config import (
+    DATA_FILE, DATA_DIR, SHEET_NAME, TARGET_FIELDS, ITEM_SCHEMA, RAW_VALUE_FIELDS,
+    PARTITION_DIR, CATALOG_FILE, PENDING_PARTITION, OTHER_PARTITION, ACTIVE_MEETINGS,
+    DUP_INDEX_FILE,
+)
+from .normalize import meeting_label, normalize_member_name, dup_key, PENDING_LABEL
+from .atomic import atomic_path
+from .xlsx_io import read_xlsx, write_xlsx
+
+# ==============================
+# 例会ごとのパーティション保存
+# ==============================
+# data_parts/pending.xlsx, data_parts/meeting_0008.xlsx ... に分割して保存し、
+# 行数などは catalog.json に持つ。画面は必要なパーティションだけを読む。
 
-def ensure_file(path: Path):
-    """ファイルがなければ空のExcelを作る"""
+def partition_key(v: object) -> str:
+    """例会の値 → パーティションキー（"pending" / 例会番号 / "other"）"""
+    label = meeting_label(v)
+    if label == PENDING_LABEL:
+        return PENDING_PARTITION
+    m = re.fullmatch(r"第(\d+)回", label)
+    return str(int(m.group(1))) if m else OTHER_PARTITION
+
+def partition_sort_key(key: str) -> tuple[int, int]:
+    """登録承認待ち → 例会番号順 → その他"""
+    if key == PENDING_PARTITION:
+        return (0, 0)
+    if key.isdigit():
+        return (1, int(key))
+    return (2, 0)
+
+def partition_label(key: str) -> str:
+    """パーティションキー → 画面の例会表示ラベル"""
+    if key == PENDING_PARTITION:
+        return PENDING_LABEL
+    if key.isdigit():
+        return f"第{int(key)}回"
+    return "その他"
+
+def _partition_path(key: str) -> Path:
+    if key.isdigit():
+        return PARTITION_DIR / f"meeting_{int(key):04d}.xlsx"
+    return PARTITION_DIR / f"{key}.xlsx"
+
+def _read_partition(key: str) -> pd.DataFrame:
+    path = _partition_path(key)
     if not path.exists():
-        df = pd.DataFrame(columns=TARGET_FIELDS)
-        with pd.ExcelWriter(path, engine="openpyxl") as w:
-            df.to_excel(w, index=False, sheet_name=SHEET_NAME)
-
-def load_items() -> pd.DataFrame:
-    """Excel → DataFrame"""
-    ensure_file(DATA_FILE)
-    df = pd.read_excel(DATA_FILE, sheet_name=SHEET_NAME, engine="openpyxl")
+        return pd.DataFrame(columns=TARGET_FIELDS)
+    return read_xlsx(path, SHEET_NAME, op="items_read")
+
+def _write_partition(key: str, part: pd.DataFrame) -> None:
+    path = _partition_path(key)
+    if part.empty:
+        path.unlink(missing_ok=True)
+        return
+    part = part.copy()
+    # 例会は保存用ラベルに揃え、例会番号は Excel 上では数値のまま残す
+    part["例会"] = _map_unique(part["例会"], canonical_meeting).map(
+        lambda v: int(v) if isinstance(v, str) and v.isdigit() else v
+    )
+    write_xlsx(part, path, SHEET_NAME, op="items_write")
+
+def _partition_stats(part: pd.DataFrame) -> dict:
+    """カタログに載せる集計（行数・会員氏名ごとの件数）"""
+    names = part["会員氏名"].dropna().astype(str).map(str.strip)
+    return {"rows": int(len(part)), "members": dict(Counter(names[names != ""].tolist()))}
+
+def _max_id(df: pd.DataFrame) -> int:
+    ids = pd.to_numeric(df.get("id", pd.Series(dtype=float)), errors="coerce")
+    return int(ids.max()) if ids.notna().any() else 0
+
+def _write_json(path: Path, data, **kwargs) -> None:
+    """JSON を一時ファイル経由で書く（毎回の再実行で読まれるので、書きかけを読ませない）"""
+    with atomic_path(path) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+
+def _save_catalog(catalog: dict) -> None:
+    _write_json(CATALOG_FILE, catalog, indent=2)
+
+def ensure_partitions() -> None:
+    """パーティション保存先を用意（初回は data.xlsx を例会ごとに分割して移行）"""
+    if CATALOG_FILE.exists():
+        return
+    PARTITION_DIR.mkdir(exist_ok=True)
+    df = pd.DataFrame(columns=TARGET_FIELDS)
+    if DATA_FILE.exists():
+        df = _complete_columns(read_xlsx(DATA_FILE, SHEET_NAME, op="items_read"))
+    _save_catalog({"max_id": 0, "partitions": {}})
+    save_items(df)
+
+def load_catalog() -> dict:
+    """パーティションの一覧（行数・会員氏名件数・採番済みの最大id）"""
+    ensure_partitions()
+    with open(CATALOG_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def list_partitions(catalog: dict | None = None) -> list[str]:
+    """空でないパーティションのキー（表示順）"""
+    catalog = catalog or load_catalog()
+    return sorted(catalog["partitions"], key=partition_sort_key)
+
+def active_partitions(catalog: dict | None = None, n: int = ACTIVE_MEETINGS) -> list[str]:
+    """日常的に使うパーティション：登録承認待ち＋直近 n 回の例会"""
+    keys = list_partitions(catalog)
+    meetings = [k for k in keys if k.isdigit()]
+    active = meetings[-n:] if n > 0 else []
+    return [k for k in keys if k == PENDING_PARTITION or k in active]
+
+def catalog_members(catalog: dict | None = None) -> Counter:
+    """全パーティションの会員氏名ごとの件数"""
+    catalog = catalog or load_catalog()
+    total = Counter()
+    for info in catalog["partitions"].values():
+        total.update(info.get("members", {}))
+    return total
+
+def next_item_id(catalog: dict | None = None) -> int:
+    """次に使う id（削除済みの id は再利用しない）"""
+    catalog = catalog or load_catalog()
+    return int(catalog.get("max_id", 0)) + 1
+
+def _complete_columns(df: pd.DataFrame) -> pd.DataFrame:
     # 欠損列を補完して順序を固定
     for c in TARGET_FIELDS:
         if c not in df.columns:
             df[c] = None
     return df[TARGET_FIELDS].copy()
 
-def save_items(df: pd.DataFrame) -> None:
-    """DataFrame → Excel"""
+# ==============================
+# 型（スキーマ）の適用
+# ==============================
+def seimai_ratio(v: object) -> float | None:
+    """精米歩合 → 割合（0.55 / 55 / "55" / "55％" → 0.55）
+
+    数値1つで表せない値（「麹米40％、掛米55％」など）は None。
+    """
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return None
+    if isinstance(v, (int, float, np.number)):
+        x = float(v)
+    else:
+        m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*%?", unicodedata.normalize("NFKC", str(v)).strip())
+        if not m:
+            return None
+        x = float(m.group(1))
+    return x / 100 if x > 1 else x
+
+def seimai_ratios(s: pd.Series) -> pd.Series:
+    """精米歩合の列 → 割合の列（Float64。表示・並べ替え用で、保存する値は変えない）"""
+    return pd.to_numeric(_map_unique(s, seimai_ratio), errors="coerce").astype("Float64")
+
+def canonical_meeting(v: object) -> str | None:
+    """例会の値 → 保存用ラベル（例会番号は "8"、登録承認待ちは None、その他はそのまま）"""
+    key = partition_key(v)
+    if key == PENDING_PARTITION:
+        return None
+    if key == OTHER_PARTITION:
+        return str(v).strip()
+    return key
+
+def _map_unique(s: pd.Series, func) -> pd.Series:
+    """値の種類ごとに1回だけ func を呼んで変換（欠損は func(None)）"""
+    codes, uniques = pd.factorize(s.astype(object), use_na_sentinel=True)
+    mapped = np.array([func(u) for u in uniques] + [func(None)], dtype=object)
+    return pd.Series(mapped[codes], index=s.index)
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """列を ITEM_SCHEMA の型に揃える（欠損列の補完・列順の固定も行う）"""
+    df = _complete_columns(df)
+    for col, dtype in ITEM_SCHEMA.items():
+        s = df[col]
+        if col == "例会":
+            s = _map_unique(s, canonical_meeting)
+
+        if dtype == "Int64":
+            s = pd.to_numeric(s, errors="coerce").round().astype("Int64")
+        elif dtype.startswith("datetime64"):
+            s = pd.to_datetime(s, errors="coerce")
+        elif dtype == "category" and col in RAW_VALUE_FIELDS:
+            # 値はそのまま（欠損だけ揃える）
+            s = _map_unique(s, lambda v: v).astype("category")
+        elif dtype == "category":
+            s = _map_unique(s, lambda v: None if v is None else str(v)).astype("category")
+        df[col] = s
+    return df
+
+def load_items(partitions=None) -> pd.DataFrame:
+    """Excel → DataFrame（partitions を指定するとそのパーティションだけ読む。None は全件）"""
+    catalog = load_catalog()
+    keys = list_partitions(catalog) if partitions is None else [
+        k for k in list_partitions(catalog) if k in set(partitions)
+    ]
+    parts = [_read_partition(k) for k in keys]
+    # 全て空の列は外してから結合し、後で補完する（空列の型が結果に影響しないように）
+    parts = [p.dropna(axis=1, how="all") for p in parts if not p.empty]
+    if not parts:
+        return apply_schema(pd.DataFrame(columns=TARGET_FIELDS))
+    return apply_schema(pd.concat(parts, ignore_index=True))
+
+def iter_items(partitions=None) -> Iterator[pd.DataFrame]:
+    """パーティションを1つずつ読み込んで返す（全件を一度にメモリに載せずに処理する用）"""
+    keys = list_partitions() if partitions is None else partitions
+    for key in keys:
+        yield load_items([key])
+
+def save_items(df: pd.DataFrame, partitions=None) -> None:
+    """DataFrame → Excel
+
+    partitions=None : df を全データとして保存（df に無いパーティションは削除）
+    partitions=[...]: df をそのパーティションの全内容として保存する。
+                      例会の変更で範囲外のパーティションへ移った行は、
+                      移動先のファイルに追記（同じ id は置き換え）する。
+    """
+    # 値の型変換はしない（読み込み時に apply_schema で揃える）。列の補完と順序の固定だけ
+    df = _complete_columns(df)
     if "updated_at" in df.columns:
         df["updated_at"] = pd.to_datetime(df["updated_at"], errors="coerce").fillna(datetime.now())
-    with pd.ExcelWriter(DATA_FILE, engine="openpyxl") as w:
-        df.to_excel(w, index=False, sheet_name=SHEET_NAME)
+
+    catalog = load_catalog()
+    existing = set(catalog["partitions"])
+    scope = existing if partitions is None else set(partitions)
+
+    keys = df["例会"].astype(object).map(partition_key) if not df.empty else pd.Series(dtype=str)
+    groups = {k: g for k, g in df.groupby(keys, sort=False)} if not df.empty else {}
+
+    for key in scope | set(groups):
+        part = groups.get(key, df.iloc[0:0])
+        if key not in scope:
+            # 範囲外のパーティション：既存の行とマージ
+            current = _read_partition(key)
+            if not current.empty:
+                current = current[~current["id"].isin(part["id"])]
+                # 全て空の列は外して結合し、後で補完する（load_items と同じ）
+                part = _complete_columns(pd.concat(
+                    [current.dropna(axis=1, how="all"), part.dropna(axis=1, how="all")], ignore_index=True
+                ))
+        _write_partition(key, part)
+        if part.empty:
+            catalog["partitions"].pop(key, None)
+        else:
+            catalog["partitions"][key] = _partition_stats(part)
+
+    # 削除済みの id を再利用しないよう、最大値は下げない
+    catalog["max_id"] = max(int(catalog.get("max_id", 0)), _max_id(df))
+    _save_catalog(catalog)
+    _update_dup_index(df, keys, scope)
+
+def append_items(df_new: pd.DataFrame) -> None:
+    """新しい行を該当パーティションへ追記（他のパーティションは読まない）"""
+    save_items(df_new, partitions=[])
+
+# ==============================
+# 重複チェック用インデックス
+# ==============================
+# 正規化した「銘柄名＋蔵元」→ id のハッシュ索引。save_items のたびに
+# 保存した行・消えた行の id だけ直すので、登録時に全件を走査しない。
+#   keys:         {キー: [id, ...]}
+#   rows:         {id: [キー, 正規化した会員氏名, パーティション]}
+#   by_partition: {パーティション: [id, ...]}
+
+def _empty_dup_index() -> dict:
+    return {"keys": {}, "rows": {}, "by_partition": {}}
+
+def _index_drop(index: dict, rid: str) -> bool:
+    row = index["rows"].pop(rid, None)
+    if not row:
+        return False
+    for bucket, k in ((index["keys"], row[0]), (index["by_partition"], row[2])):
+        ids = bucket.get(k, [])
+        if rid in ids:
+            ids.remove(rid)
+        if not ids:
+            bucket.pop(k, None)
+    return True
+
+def _index_put(index: dict, rid: str, key: str, mem: str, partition: str) -> bool:
+    """id の登録を [キー, 会員氏名, パーティション] に合わせる（変わらなければ何もしない）"""
+    if index["rows"].get(rid) == [key, mem, partition]:
+        return False
+    _index_drop(index, rid)
+    index["keys"].setdefault(key, []).append(rid)
+    index["rows"][rid] = [key, mem, partition]
+    index["by_partition"].setdefault(partition, []).append(rid)
+    return True
+
+def _index_rows(df: pd.DataFrame, partitions) -> Iterator[tuple[str, str, str, str]]:
+    """(id, キー, 正規化した会員氏名, パーティション)。キーが空の行はキーも空で返す"""
+    for rid, name, kura, member, partition in zip(df["id"], df["name"], df["蔵元"], df["会員氏名"], partitions):
+        if pd.isna(rid):
+            continue
+        mem = normalize_member_name(str(member)) if pd.notna(member) else ""
+        yield str(int(rid)), dup_key(name, kura), mem, partition
+
+def _index_add(index: dict, partition: str, part: pd.DataFrame) -> None:
+    for rid, key, mem, _ in _index_rows(part, [partition] * len(part)):
+        if key:
+            _index_put(index, rid, key, mem, partition)
+
+def _save_dup_index(index: dict) -> None:
+    _write_json(DUP_INDEX_FILE, index)
+
+def _update_dup_index(df: pd.DataFrame, partitions: pd.Series, scope: set) -> None:
+    """保存した行の分だけ索引を直す（索引が未作成なら何もしない）
+
+    df の行は入れ直し（変わっていない行はそのまま）、scope のパーティションに載っていて
+    df に無い id は外す。範囲外のパーティションへの追記では、追記した行だけを扱う。
+    """
+    if not DUP_INDEX_FILE.exists():
+        return
+    with open(DUP_INDEX_FILE, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    changed = False
+    saved = set()
+    for rid, key, mem, partition in _index_rows(df, partitions):
+        saved.add(rid)
+        changed |= _index_put(index, rid, key, mem, partition) if key else _index_drop(index, rid)
+    removed = {rid for p in scope for rid in index["by_partition"].get(p, [])} - saved
+    for rid in removed:
+        changed |= _index_drop(index, rid)
+    if changed:
+        _save_dup_index(index)
+
+def load_dup_index() -> dict:
+    """重複チェック用インデックス（なければ全パーティションから作成）"""
+    if not DUP_INDEX_FILE.exists():
+        index = _empty_dup_index()
+        for key in list_partitions():
+            _index_add(index, key, _complete_columns(_read_partition(key)))
+        _save_dup_index(index)
+        return index
+    with open(DUP_INDEX_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def find_duplicates(name: str, kuramoto: str, member: str | None = None,
+                    partition: str | None = None, index: dict | None = None) -> list[int]:
+    """同じ銘柄名＋蔵元の既存 id を返す
+
+    member / partition を指定すると、そのどちらかが一致するものだけに絞る
+    （同じ会員の二重登録、同じ例会への同じ酒の持ち込み）。
+    """
+    key = dup_key(name, kuramoto)
+    if not key:
+        return []
+    index = index or load_dup_index()
+    mem = normalize_member_name(member) if member else None
+    hits = []
+    for rid in index["keys"].get(key, []):
+        _, row_mem, row_part = index["rows"][rid]
+        if mem is None and partition is None:
+            hits.append(int(rid))
+        elif (mem is not None and row_mem == mem) or (partition is not None and row_part == partition):
+            hits.append(int(rid))
+    return hits
+
+def duplicate_groups(with_member: bool = False, with_meeting: bool = False) -> list[list[int]]:
+    """2件以上ある自然キーごとの id のまとまり（会員氏名・例会を条件に加えることもできる）"""
+    index = load_dup_index()
+    groups = []
+    for ids in index["keys"].values():
+        if len(ids) < 2:
+            continue
+        buckets = {}
+        for rid in ids:
+            _, mem, part = index["rows"][rid]
+            sub = (mem if with_member else None, part if with_meeting else None)
+            buckets.setdefault(sub, []).append(int(rid))
+        groups += [sorted(b) for b in buckets.values() if len(b) >= 2]
+    return sorted(groups)
+
+def partitions_of(ids, index: dict | None = None) -> list[str]:
+    """id が入っているパーティション（表示のために読むファイルを絞る）"""
+    index = index or load_dup_index()
+    return sorted({index["rows"][str(i)][2] for i in ids if str(i) in index["rows"]}, key=partition_sort_key)
 
 # ==============================
 # 会員氏名の選択頻度管理
 # ==============================
-from collections import Counter
-import json
+HISTORY_FILE = DATA_DIR / "member_select_history.json"
+
+# 初期ブートストラップ済みかどうか（プロセス内で1回だけ判定すればよい）
+_history_seeded = False
 
-_DATA_DIR = Path(".data")  # 保存用ディレクトリ
-_DATA_DIR.mkdir(exist_ok=True)
-HISTORY_FILE = _DATA_DIR / "member_select_history.json"
+def ensure_data_dir() -> None:
+    """保存用ディレクトリを作成（import時ではなく初回書き込み時に作る）"""
+    DATA_DIR.mkdir(exist_ok=True)
 
 def load_member_history() -> Counter:
     """会員氏名の選択頻度を読み込む（なければ空のCounter）"""
@@ -48,13 +403,17 @@ def load_member_history() -> Counter:
 
 def save_member_history(counter: Counter) -> None:
     """頻度データを保存"""
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(counter, f, ensure_ascii=False, indent=2)
+    ensure_data_dir()
+    _write_json(HISTORY_FILE, counter, indent=2)
 
 def bump_member_history(name: str) -> Counter:
     """指定氏名のカウントを+1して保存"""
+    return bump_member_history_many([name])
+
+def bump_member_history_many(names) -> Counter:
+    """複数の氏名（重複可）のカウントをまとめて加算し、1回だけ保存"""
     counter = load_member_history()
-    counter[name] += 1
+    counter.update(n for n in names if n)
     save_member_history(counter)
     return counter
 
@@ -65,19 +424,25 @@ def sort_members_by_frequency(member_names) -> list[str]:
     return sorted(cleaned, key=lambda x: (-counter.get(x, 0), str(x)))
 
 # 初期ブートストラップ：履歴が空なら既存データの出現回数で初期化
-def seed_member_history_from_items(df: pd.DataFrame) -> None:
-    from collections import Counter
+def seed_member_history_from_counts(base_counts: Counter) -> None:
+    global _history_seeded
+    if _history_seeded:  # 同一プロセス内では再判定しない
+        return
     counter = load_member_history()
     if counter:  # もう履歴があれば何もしない
+        _history_seeded = True
         return
-    if "会員氏名" not in df.columns:
-        return
-    ser = df["会員氏名"].dropna().astype(str).map(str.strip)
-    ser = ser[ser != ""]
-    if ser.empty:
+    if not base_counts:
         return
-    base_counts = Counter(ser.tolist())
     # 既存データの出現回数で初期値を入れる
     for k, v in base_counts.items():
         counter[k] += int(v)
     save_member_history(counter)
+    _history_seeded = True
+
+def seed_member_history_from_items(df: pd.DataFrame) -> None:
+    if "会員氏名" not in df.columns:
+        return
+    ser = df["会員氏名"].dropna().astype(str).map(str.strip)
+    ser = ser[ser != ""]
+    seed_member_history_from_counts(Counter(ser.tolist()))
@@ -1,15 +1,12 @@
 import streamlit as st
-import pandas as pd
-from .audit import _read_audit
 
 def render_audit_page(auth):
-    import streamlit as st
-    from .audit import _read_audit
-
     if auth.get("role") != "admin":
         st.warning("このページは管理者のみが閲覧できます。")
         return
 
+    from .audit import _read_audit  # pandas は管理者が開いたときだけ読み込む
+
     st.subheader("🪵 変更履歴（最新100件）")
 
     logs = _read_audit()
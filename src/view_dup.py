@@ -0,0 +1,34 @@
+import streamlit as st
+
+def render_dup_page(auth):
+    if auth.get("role") != "admin":
+        st.warning("このページは管理者のみが閲覧できます。")
+        return
+
+    from .storage import duplicate_groups, partitions_of, load_items
+
+    st.subheader("🔁 重複の可能性があるデータ")
+    st.caption("銘柄名＋蔵元（全角/半角・空白・大文字小文字を無視）が同じものをまとめています。")
+
+    c1, c2 = st.columns(2)
+    with c1:
+        with_member = st.checkbox("会員氏名も一致するものだけ", value=False, key="dup_with_member")
+    with c2:
+        with_meeting = st.checkbox("例会も一致するものだけ", value=False, key="dup_with_meeting")
+
+    groups = duplicate_groups(with_member=with_member, with_meeting=with_meeting)
+    if not groups:
+        st.info("重複の可能性があるデータはありません。")
+        return
+
+    # 該当する id が入っているパーティションだけを読む
+    all_ids = [rid for g in groups for rid in g]
+    df = load_items(partitions_of(all_ids))
+    group_no = {rid: n for n, g in enumerate(groups, start=1) for rid in g}
+    df = df[df["id"].isin(all_ids)].copy()
+    df.insert(0, "グループ", df["id"].map(group_no))
+    df = df.sort_values(["グループ", "id"])
+
+    st.markdown(f"**{len(groups)}グループ / {len(df)}件**")
+    cols = ["グループ", "id", "name", "蔵元", "会員氏名", "例会", "updated_at"]
+    st.dataframe(df[cols], width="stretch", hide_index=True)
@@ -1,23 +1,30 @@
 import streamlit as st
 import pandas as pd
-import unicodedata
 import re
 
 from datetime import datetime
 from .storage import (
-    load_items, save_items,
+    load_items, iter_items, save_items, append_items,
+    load_catalog, list_partitions, active_partitions, catalog_members, next_item_id,
+    partition_key, partition_label, partition_sort_key,
     sort_members_by_frequency,
-    bump_member_history, seed_member_history_from_items,
+    bump_member_history, seed_member_history_from_counts,
+    find_duplicates, partitions_of, seimai_ratios,
 )
-from .audit import append_audit
-
-def normalize_member_name(s: str) -> str:
-    if not s:
-        return s
-    s = unicodedata.normalize("NFKC", s)   # 全角→半角など
-    s = s.strip()
-    s = re.sub(r"\s+", " ", s)             # 連続空白を単一スペースに
-    return s
+from .config import PENDING_PARTITION
+from .audit import append_audit, append_audit_many
+from .normalize import normalize_member_name, meeting_label
+from .export import export_buttons
+from .bulk_entry import bulk_entry_form
+from .paging import paginate, pager, paged_multiselect
+
+def _toggle_partition(key: str, widget_key: str) -> None:
+    """グループ表示で古い例会を開く / 閉じる"""
+    open_parts = st.session_state.setdefault("open_partitions", set())
+    if st.session_state[widget_key]:
+        open_parts.add(key)
+    else:
+        open_parts.discard(key)
 
 def render_main_page(auth):
     """📦 データ管理ページ"""
@@ -30,49 +37,22 @@ def render_main_page(auth):
     # 📋 登録済みデータタブ
     # -------------------------------------------------
     with tabs[0]:
-        df = load_items()
-        if df.empty:
+        catalog = load_catalog()
+        part_keys = list_partitions(catalog)
+        if not part_keys:
+            needed = []
+            df = load_items(needed)
             st.info("データがまだ登録されていません。")
         else:
             group_mode = st.toggle("📚 例会ごとにグループ表示", value=True)
-            view = df.copy()
-
-            import re
-            
-            # === 例会ラベル整形 ===
-            def meeting_label(v: object) -> str:
-                s = str(v).strip()
-                if s in ["", "nan", "None"]:
-                    return "登録承認待ち"
-                if "第" in s and "回" in s:
-                    return s
-                try:
-                    n = int(float(s))
-                    return f"第{n}回"
-                except Exception:
-                    return s
 
-            view["例会表示"] = view.get("例会", pd.Series([""] * len(view))).apply(meeting_label)
-
-            # 会員氏名オプション（頻度順）
-            seed_member_history_from_items(view)  # 履歴が空なら既存出現回数で初期化
-            _name_base = (
-                view["会員氏名"]
-                .dropna()
-                .astype(str).map(str.strip)
-            )
-            _name_base = [x for x in _name_base.unique().tolist() if x]
-            name_opts = ["(すべて)"] + sort_members_by_frequency(sorted(_name_base))
+            # 会員氏名オプション（頻度順）：カタログから作るので本体は読まない
+            member_counts = catalog_members(catalog)
+            seed_member_history_from_counts(member_counts)  # 履歴が空なら既存出現回数で初期化
+            name_opts = ["(すべて)"] + sort_members_by_frequency(sorted(member_counts))
 
             # 例会オプション（「登録承認待ち」→数値順）
-            def _sort_meeting_key(x: str):
-                if x == "登録承認待ち":
-                    return (0, 0)
-                m = re.search(r"\d+", str(x))
-                num = int(m.group()) if m else 10**9
-                return (1, num)
-
-            meeting_opts = ["(すべて)"] + sorted(view["例会表示"].dropna().unique(), key=_sort_meeting_key)
+            meeting_opts = ["(すべて)"] + [partition_label(k) for k in part_keys]
 
             # UI（2カラム）
             c1, c2 = st.columns([1.2, 1])
@@ -81,6 +61,28 @@ def render_main_page(auth):
             with c2:
                 sel_meeting = st.selectbox("例会で絞り込み", meeting_opts, index=0, key="search_meeting")
 
+            # === 読み込むパーティションを決める ===
+            if sel_meeting != "(すべて)":
+                needed = [k for k in part_keys if partition_label(k) == sel_meeting]
+            elif sel_name != "(すべて)":
+                target = normalize_member_name(sel_name)
+                needed = [
+                    k for k in part_keys
+                    if any(normalize_member_name(m) == target for m in catalog["partitions"][k]["members"])
+                ]
+            elif group_mode:
+                # 登録承認待ち＋直近の例会だけ。古い例会は開いたときに読む
+                # （開いた例会はウィジェットとは別のキーに持つ。ウィジェットの状態は描画されない回に消えるため）
+                open_parts = st.session_state.setdefault("open_partitions", set())
+                needed = active_partitions(catalog) + [k for k in part_keys if k in open_parts]
+            else:
+                needed = None  # 全件
+            df = load_items(needed)
+            view = df.copy()
+
+            # === 例会ラベル整形 ===
+            view["例会表示"] = view.get("例会", pd.Series([""] * len(view))).apply(meeting_label)
+
             # 絞り込み適用
             if sel_name != "(すべて)":
                 target = normalize_member_name(sel_name)
@@ -88,25 +90,16 @@ def render_main_page(auth):
                 view = view[view["_name_norm"] == target].drop(columns=["_name_norm"], errors="ignore")
 
             if sel_meeting != "(すべて)":
-                view = view[view["例会表示"] == sel_meeting]
+                view = view[view["例会"].astype(object).map(partition_key).isin(needed)]
 
             # === 精米歩合の安全整形 ===
-            def fmt_seimai(x) -> str:
-                s = str(x).strip()
-                if s in ("", "nan", "None", "-"):
-                    return ""
-                # 数値が含まれていれば最初の数値を抽出
-                m = re.search(r"\d+(\.\d+)?", s)
-                if m:
-                    v = float(m.group())
-                    if v <= 1:  # 0.55 → 55%
-                        v *= 100
-                    return f"{v:.0f}％"
-                # 数値が見つからない場合（例：「麹米40％、掛米55％」など）はそのまま返す
-                return s
-
+            # 数値1つで表せる値は「55％」に揃え、そうでない値（例：「麹米40％、掛米55％」など）はそのまま表示
             if "精米歩合" in view.columns:
-                view["精米歩合"] = view["精米歩合"].apply(fmt_seimai).astype(str)
+                ratio = seimai_ratios(view["精米歩合"])
+                text = view["精米歩合"].astype(object).map(lambda x: "" if pd.isna(x) else str(x).strip())
+                pct = (ratio * 100).round().astype("Int64").astype(str) + "％"
+                view["精米歩合"] = text.where(ratio.isna(), pct)
+                view["_seimai_ratio"] = ratio  # 並べ替え用（表示文字列では「100％」が「55％」より前になる）
 
             # === 表示対象列（idは除外） ===
             display_cols = ["name", "蔵元", "地域", "category", "会員氏名", "精米歩合", "備考", "例会表示"]
@@ -114,64 +107,77 @@ def render_main_page(auth):
 
             # === グループ表示 ===
             if group_mode:
-                import re
-                def group_sort_key(label: str) -> tuple[int, int]:
-                    if label == "登録承認待ち":
-                        return (0, -1)  # ← 最優先で先頭
-                    m = re.search(r"\d+", label)
-                    num = int(m.group()) if m else 9999
-                    return (1, num)
-
-                for key in sorted(view["例会表示"].unique(), key=group_sort_key):
-                    g = view[view["例会表示"] == key]
-                    st.markdown(f"**■ 例会: {key}（{len(g)}件）**")
-                    st.dataframe(
-                        g[display_cols],
-                        width="stretch",
-                        hide_index=True
-                    )
+                filtered = sel_meeting != "(すべて)" or sel_name != "(すべて)"
+                group_keys = [k for k in part_keys if k in set(needed)] if filtered else part_keys
+                closable = [] if filtered else [k for k in part_keys if k not in set(active_partitions(catalog))]
+                for key in group_keys:
+                    label = partition_label(key)
+                    if key in set(needed):
+                        g = view[view["例会"].astype(object).map(partition_key) == key]
+                        st.markdown(f"**■ 例会: {label}（{len(g)}件）**")
+                    else:
+                        # 未読み込みの例会は件数（カタログ）だけ表示
+                        st.markdown(f"**■ 例会: {label}（{catalog['partitions'][key]['rows']}件）**")
+                    if key in closable:
+                        # 古い例会は開閉できる（チェックを外すと閉じる）
+                        wkey = f"open_part_{key}"
+                        st.session_state.setdefault(wkey, key in st.session_state["open_partitions"])
+                        st.checkbox("表示する", key=wkey, on_change=_toggle_partition, args=(key, wkey))
+                    if key in set(needed):
+                        st.dataframe(
+                            g[display_cols],
+                            width="stretch",
+                            hide_index=True
+                        )
             else:
-                st.dataframe(view[display_cols], width="stretch", hide_index=True)
+                # サーバー側でページ分割し、表示中のページだけをブラウザへ送る
+                page, page_size, sort_col, ascending = pager("main_table", len(view), display_cols)
+                # 表示用に整形した列は値で並べ替える（精米歩合は割合、例会は回の番号順）
+                if sort_col == "例会表示":
+                    view["_meeting_order"] = view["例会"].astype(object).map(partition_key).map(partition_sort_key)
+                sort_key = {"精米歩合": "_seimai_ratio", "例会表示": "_meeting_order"}.get(sort_col, sort_col)
+                page_df, _ = paginate(view, page, page_size, sort_key, ascending)
+                st.dataframe(page_df[display_cols], width="stretch", hide_index=True)
+                st.caption(f"{len(view)}件中 {len(page_df)}件を表示")
+
+            # === エクスポート（絞り込み結果 / 全件） ===
+            total_rows = sum(info["rows"] for info in catalog["partitions"].values())
+            # 絞り込みなし（グループ表示では一部の例会しか読んでいない）のときは全件と同じ内容にする
+            no_filter = sel_meeting == "(すべて)" and sel_name == "(すべて)"
+            export_buttons(None if no_filter else df.loc[view.index], iter_items, total_rows)
 
             # --- 管理者だけ：例会番号の付与/編集 -------------------------
             if auth.get("role") == "admin":
-                import re
 
                 st.divider()
                 st.subheader("🗂 例会番号の付与 / 編集（管理者）")
 
-                df_all = df  # 表示に使った df をそのまま使う
-
-                # 登録承認待ち（例会 未設定）を抽出
-                is_pending = df_all.get("例会").isna() | (df_all.get("例会").astype(str).str.strip() == "")
-                pending_df = df_all[is_pending]
-
                 mode = st.radio(
                     "対象の選び方",
                     ["登録承認待ちのみ", "全データから選ぶ"],
                     horizontal=True,
                     key="meeting_edit_scope"
                 )
-                candidates = pending_df if mode == "登録承認待ちのみ" else df_all
+                # 登録承認待ち（例会 未設定）はパーティションだけ読む
+                edit_parts = [PENDING_PARTITION] if mode == "登録承認待ちのみ" else None
+                df_all = load_items(edit_parts)
+                candidates = df_all
 
                 if candidates.empty:
                     st.info("現在、付与/編集対象の候補がありません。")
                 else:
-                    # レコード選択（複数可）
-                    def label_for(i: int) -> str:
-                        row = candidates.loc[i]
-                        rid = row.get("id")
-                        nm  = str(row.get("name", ""))
-                        mem = str(row.get("会員氏名", ""))
-                        mt  = str(row.get("例会", "")).strip() or "登録承認待ち"
-                        return f"[id:{rid}] {mem} / {nm} / 例会:{mt}"
-
-                    indices = candidates.index.tolist()
-                    chosen = st.multiselect(
-                        "対象レコード（複数選択可）",
-                        options=indices,
-                        format_func=label_for
+                    # レコード選択（複数可）：ラベルはまとめて作り、候補は検索＋ページ送りで絞る
+                    mt = candidates["例会"].astype(str).str.strip()
+                    mt = mt.where(~mt.isin(["", "nan", "None", "<NA>"]), "登録承認待ち")
+                    labels = (
+                        "[id:" + candidates["id"].astype(str) + "] "
+                        + candidates["会員氏名"].astype(str)
+                        + " / " + candidates["name"].astype(str)
+                        + " / 例会:" + mt
                     )
+                    # 選択は再実行をまたいで保持されるので、行位置ではなく id で持つ
+                    labels.index = candidates["id"].astype(int).values
+                    chosen = paged_multiselect("対象レコード（複数選択可）", labels, key="meeting_pick")
 
                     colA, colB = st.columns([1,1])
                     with colA:
@@ -196,22 +202,20 @@ def render_main_page(auth):
                                 return str(int(m.group())) if m else None  # 例会列には「数字文字列」を格納
 
                             new_val = normalize_meeting(meeting_input)
-                            before_rows = df_all.loc[chosen].copy()
-
-                            # 例会を更新
-                            df_all.loc[chosen, "例会"] = new_val
-
-                            # 保存 & 監査ログ
-                            save_items(df_all)
-                            for _, b in before_rows.iterrows():
-                                rid = b.get("id")
-                                after = df_all[df_all["id"] == rid].iloc[0].to_dict()
-                                append_audit(
-                                    action="update_meeting",
-                                    user=auth.get("user"),
-                                    before=b.to_dict(),
-                                    after=after,
-                                )
+                            target = df_all["id"].isin(chosen)
+                            before_rows = df_all[target].copy()
+
+                            # 例会を更新（category 列のままだと新しい値を入れられないので object に戻す）
+                            df_all["例会"] = df_all["例会"].astype(object)
+                            df_all.loc[target, "例会"] = new_val
+
+                            # 保存 & 監査ログ（例会が変わった行は移動先のパーティションへ）
+                            save_items(df_all, partitions=edit_parts)
+                            append_audit_many(
+                                "update_meeting",
+                                user=auth.get("user"),
+                                changes=[(b.to_dict(), df_all.loc[i].to_dict()) for i, b in before_rows.iterrows()],
+                            )
 
                             st.success(f"{len(chosen)}件に適用しました。")
                             st.cache_data.clear()
@@ -221,16 +225,32 @@ def render_main_page(auth):
             st.divider()
             st.subheader("✏️ 管理者編集")
             if st.button("💾 データ保存"):
-                save_items(df)
+                save_items(df, partitions=needed)
                 append_audit("manual_save", user=auth.get("user"), before=None, after="save")
                 st.success("保存しました。")
 
         # === 管理者専用：一括削除 ===
-        if auth.get("role") == "admin" and not df.empty:
+        if auth.get("role") == "admin" and part_keys:
             st.divider()
             st.subheader("🗑️ 一括削除（管理者）")
 
-            df_all = load_items()
+            # ② 絞り込み（任意）
+            c1, c2 = st.columns(2)
+            with c1:
+                q_del = st.text_input("🔎 フリーワード（銘柄 / 会員 / 蔵元 / 地域 / 種別）", "")
+            with c2:
+                # 選んだ例会のパーティションだけを読む。初期値は登録承認待ち（なければ直近の例会）で、
+                # 「(すべて)」は明示的に選んだときだけ全件を読む
+                options_meeting = ["(すべて)"] + [partition_label(k) for k in part_keys]
+                active = active_partitions(catalog)
+                default_key = PENDING_PARTITION if PENDING_PARTITION in part_keys else (active or part_keys)[-1]
+                del_meeting = st.selectbox("例会で絞り込み", options_meeting,
+                                           index=options_meeting.index(partition_label(default_key)))
+
+            del_parts = None if del_meeting == "(すべて)" else [
+                k for k in part_keys if partition_label(k) == del_meeting
+            ]
+            df_all = load_items(del_parts)
 
             # ① 表示用IDラベル（見やすさ用）
             view_del = df_all.copy()
@@ -241,44 +261,12 @@ def render_main_page(auth):
                 + " / " + df_all.get("蔵元", "").astype(str)
             )
 
-            # ② 絞り込み（任意）
-            c1, c2 = st.columns(2)
-            with c1:
-                q_del = st.text_input("🔎 フリーワード（銘柄 / 会員 / 蔵元 / 地域 / 種別）", "")
-            with c2:
-                # 例会表示を使って「登録承認待ち」などで絞る（任意）
-                def meeting_label(v: object) -> str:
-                    s = str(v).strip()
-                    if s in ["", "nan", "None"]:
-                        return "登録承認待ち"
-                    if "第" in s and "回" in s:
-                        return s
-                    try:
-                        n = int(float(s))
-                        return f"第{n}回"
-                    except Exception:
-                        return s
-                view_del["例会表示"] = view_del.get("例会", pd.Series([""] * len(view_del))).apply(meeting_label)
-
-
-                def _sort_meeting_key(x: str):
-                    if x == "登録承認待ち":
-                        return (0, 0)
-                    m = re.search(r"\d+", str(x))
-                    num = int(m.group()) if m else 10**9  # 数字が無いものは最後へ
-                    return (1, num)
-
-                options_meeting_sorted = sorted(view_del["例会表示"].dropna().unique(), key=_sort_meeting_key)
-                options_meeting = ["(すべて)"] + options_meeting_sorted
-
-                sel_meeting = st.selectbox("例会で絞り込み", options_meeting, index=0)
-
             # ③ 絞り込み適用
             filt = view_del.copy()
             if q_del:
                 ql = q_del.lower()
                 def contains(s: pd.Series) -> pd.Series:
-                    return s.fillna("").astype(str).str.lower().str.contains(ql, na=False)
+                    return s.astype(object).fillna("").astype(str).str.lower().str.contains(ql, na=False)
                 filt = filt[
                     contains(filt.get("name", pd.Series([""]*len(filt))))
                     | contains(filt.get("会員氏名", pd.Series([""]*len(filt))))
@@ -286,22 +274,14 @@ def render_main_page(auth):
                     | contains(filt.get("地域", pd.Series([""]*len(filt))))
                     | contains(filt.get("category", pd.Series([""]*len(filt))))
                 ]
-            if sel_meeting != "(すべて)":
-                filt = filt[filt["例会表示"] == sel_meeting]
 
             # ④ 複数選択 → 削除
             if filt.empty:
                 st.info("該当するレコードがありません。")
             else:
-                # IDのリストと表示ラベル
-                id_list = filt["id"].tolist()
-                label_map = {int(r["id"]): r["ラベル"] for _, r in filt.iterrows()}
-
-                chosen = st.multiselect(
-                    "削除対象を選択（複数可）",
-                    options=id_list,
-                    format_func=lambda rid: label_map.get(int(rid), f"[id:{rid}]"),
-                )
+                # IDごとの表示ラベル（候補はページ送りで表示。絞り込みは上のフリーワードで行う）
+                labels = pd.Series(filt["ラベル"].values, index=filt["id"].astype(int).values)
+                chosen = paged_multiselect("削除対象を選択（複数可）", labels, key="delete_pick", searchable=False)
 
                 colx, coly = st.columns([1,1])
                 with colx:
@@ -315,16 +295,14 @@ def render_main_page(auth):
 
                     # 実削除
                     df_after = df_all[~df_all["id"].isin(chosen)].copy()
-                    save_items(df_after)
-
-                    # 監査ログ（1件ずつ）
-                    for _, b in before_rows.iterrows():
-                        append_audit(
-                            action="delete",
-                            user=auth.get("user"),
-                            before=b.to_dict(),
-                            after=None
-                        )
+                    save_items(df_after, partitions=del_parts)
+
+                    # 監査ログ（1件1行、書き込みは1回）
+                    append_audit_many(
+                        "delete",
+                        user=auth.get("user"),
+                        changes=[(b.to_dict(), None) for _, b in before_rows.iterrows()],
+                    )
 
                     st.success(f"🗑️ {len(chosen)}件を削除しました。")
                     st.cache_data.clear()
@@ -333,7 +311,7 @@ def render_main_page(auth):
             # === 管理者専用: 例会番号登録フォーム ===
             st.subheader("🗂️ 登録承認待ち → 例会番号付与")
 
-            pending = df[df.get("例会", "") == "登録承認待ち"]
+            pending = load_items([PENDING_PARTITION])
             if pending.empty:
                 st.info("現在、登録承認待ちのデータはありません。")
             else:
@@ -347,15 +325,15 @@ def render_main_page(auth):
                 meeting_input = st.text_input("付与する例会番号（数字のみ、例：8）")
 
                 if st.button("📌 例会番号を登録"):
-                    import re
                     m = re.fullmatch(r"\d+", meeting_input.strip())
                     if not m:
                         st.error("⚠️ 数字のみで入力してください。")
                     else:
                         meeting_num = f"第{int(meeting_input)}回"
                         target_id = int(target.split(":")[0])
-                        df.loc[df["id"] == target_id, "例会"] = meeting_num
-                        save_items(df)
+                        pending["例会"] = pending["例会"].astype(object)
+                        pending.loc[pending["id"] == target_id, "例会"] = meeting_num
+                        save_items(pending, partitions=[PENDING_PARTITION])
                         append_audit("update_meeting", user=auth.get("user"), before=None, after={"id": target_id, "例会": meeting_num})
                         st.success(f"✅ ID {target_id} のデータに {meeting_num} を登録しました！")
                         st.cache_data.clear()
@@ -366,15 +344,16 @@ def render_main_page(auth):
     with tabs[1]:
         st.subheader("🆕 新規登録フォーム")
 
+        entry_mode = st.radio("登録方法", ["1件ずつ", "まとめて登録"], horizontal=True, key="entry_mode")
+        if entry_mode == "まとめて登録":
+            bulk_entry_form(auth)
+            return
+
         with st.form("entry_form", clear_on_submit=False):
             col1, col2 = st.columns(2)
             with col1:
-                # 既存会員の候補を用意（頻度順）
-                _df_names = load_items()
-                seed_member_history_from_items(_df_names)
-                _base = _df_names["会員氏名"].dropna().astype(str).map(str.strip)
-                _base = [x for x in _base.unique().tolist() if x]
-                _member_names_sorted = sort_members_by_frequency(sorted(_base))
+                # 既存会員の候補を用意（頻度順）：カタログの会員氏名を使う
+                _member_names_sorted = sort_members_by_frequency(sorted(catalog_members()))
 
                 st.markdown("**会員氏名**")
                 mode = st.radio(
@@ -411,6 +390,7 @@ def render_main_page(auth):
                 seimai = st.text_input("精米歩合（％・半角数字のみ）", help="例：60")
                 bikou = st.text_area("備考", height=80)
 
+            force_dup = st.checkbox("重複の可能性があっても登録する", value=False, key="force_dup")
             submitted = st.form_submit_button("📤 登録する")
 
             if submitted:
@@ -430,7 +410,6 @@ def render_main_page(auth):
                     st.error("⚠️ 会員氏名と銘柄名は必須です。")
                     has_error = True
 
-                import re
                 if seimai and not re.fullmatch(r"[0-9]+(\.[0-9]+)?", seimai):
                     st.error("⚠️ 精米歩合は半角数字（小数点可）のみで入力してください。")
                     has_error = True
@@ -439,9 +418,18 @@ def render_main_page(auth):
                     st.warning("⚠️ 入力内容を修正してからもう一度送信してください。")
                     return
 
-                # === 登録処理 ===
-                df = load_items()
-                next_id = int(pd.to_numeric(df.get("id", pd.Series(dtype=float)), errors="coerce").fillna(0).max()) + 1
+                # === 重複チェック ===（索引を引くだけで本体は読まない）
+                # 同じ会員の同じ銘柄、または登録承認待ちに同じ銘柄があれば警告
+                dup_ids = find_duplicates(meigara, kuramoto, member=kaiin, partition=PENDING_PARTITION)
+                if dup_ids and not force_dup:
+                    dups = load_items(partitions_of(dup_ids))
+                    dups = dups[dups["id"].isin(dup_ids)]
+                    st.warning(f"⚠️ 同じ銘柄・蔵元の登録が {len(dup_ids)}件 あります。重複でなければ「重複の可能性があっても登録する」にチェックして再送信してください。")
+                    st.dataframe(dups[["id", "name", "蔵元", "会員氏名", "例会"]], width="stretch", hide_index=True)
+                    return
+
+                # === 登録処理 ===（登録承認待ちパーティションへ追記するだけ）
+                next_id = next_item_id()
 
                 new_row = pd.DataFrame([
                     {
@@ -459,8 +447,7 @@ def render_main_page(auth):
                     }
                 ])
 
-                df = pd.concat([df, new_row], ignore_index=True)
-                save_items(df)
+                append_items(new_row)
 
                 bump_member_history(kaiin.strip())
 
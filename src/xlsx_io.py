@@ -0,0 +1,114 @@
+import logging
+import os
+from importlib.util import find_spec
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from .atomic import atomic_path
+from .config import XLSX_ENGINES
+
+logger = logging.getLogger(__name__)
+
+# 速い順。"auto" はインストールされている最初のものを使う
+READ_ENGINES = ["calamine", "openpyxl"]
+WRITE_ENGINES = ["xlsxwriter", "openpyxl"]
+_MODULES = {"calamine": "python_calamine", "openpyxl": "openpyxl", "xlsxwriter": "xlsxwriter"}
+
+CHUNK_ROWS = 5000  # 1回に変換する行数（書き出し時のメモリ使用量の上限を決める）
+
+
+def available(engine: str) -> bool:
+    """エンジンが使えるか（calamine は pandas 2.2 以降が必要）"""
+    if engine not in _MODULES or find_spec(_MODULES[engine]) is None:
+        return False
+    if engine == "calamine":
+        major, minor = (int(x) for x in pd.__version__.split(".")[:2])
+        return (major, minor) >= (2, 2)
+    return True
+
+
+def resolve_engine(op: str, engine: str | None = None) -> str:
+    """操作名（"items_read" など）に対して使うエンジンを決める
+
+    engine を省略すると XLSX_ENGINES の設定に従う。指定されたエンジンが
+    入っていなければ openpyxl に切り替える。
+    """
+    candidates = READ_ENGINES if op.endswith("_read") else WRITE_ENGINES
+    name = engine or XLSX_ENGINES.get(op, "auto")
+    if name == "auto":
+        return next(e for e in candidates if available(e))
+    if name not in candidates or not available(name):
+        logger.warning("xlsx engine %r is not available for %s; using openpyxl", name, op)
+        return "openpyxl"
+    return name
+
+
+def read_xlsx(src, sheet_name, op: str, engine: str | None = None) -> pd.DataFrame:
+    """xlsx → DataFrame（openpyxl は pandas 内で read_only モードで開かれる）"""
+    return pd.read_excel(src, sheet_name=sheet_name, engine=resolve_engine(op, engine))
+
+
+def open_xlsx(src, op: str, engine: str | None = None) -> pd.ExcelFile:
+    """シート一覧を見てから読む場合用（pd.read_excel(xls, sheet_name=...) で同じエンジンを使う）"""
+    return pd.ExcelFile(src, engine=resolve_engine(op, engine))
+
+
+def iter_rows(df: pd.DataFrame, chunk_size: int = CHUNK_ROWS) -> Iterator[list]:
+    """DataFrame を chunk_size 行ずつ Python の値（欠損は None）に変換して1行ずつ返す"""
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            yield list(row)
+
+
+def write_xlsx(df: pd.DataFrame, out, sheet_name: str, op: str,
+               engine: str | None = None, chunk_size: int = CHUNK_ROWS) -> None:
+    """DataFrame → xlsx（行を逐次書き出すのでメモリ使用量は行数によらずほぼ一定）
+
+    openpyxl は write_only モード、xlsxwriter は constant_memory モードで書く。
+    out はパスまたはファイルオブジェクト。
+    """
+    write_xlsx_parts([df], list(df.columns), out, sheet_name, op, engine, chunk_size)
+
+
+def write_xlsx_parts(parts: Iterable[pd.DataFrame], columns: list, out, sheet_name: str, op: str,
+                     engine: str | None = None, chunk_size: int = CHUNK_ROWS) -> None:
+    """同じ列の DataFrame を順に1つのシートへ書く（parts をジェネレーターにすれば全体をメモリに載せない）
+
+    out がパスのときは一時ファイルに書いてから置き換える（読み込み中の他セッションに書きかけを見せない）。
+    """
+    engine = resolve_engine(op, engine)
+    header = [str(c) for c in columns]
+    rows = (row for df in parts for row in iter_rows(df[columns], chunk_size))
+    if isinstance(out, (str, os.PathLike)):
+        with atomic_path(out) as tmp:
+            _write_rows(engine, header, rows, tmp, sheet_name)
+    else:
+        _write_rows(engine, header, rows, out, sheet_name)
+
+
+def _write_rows(engine: str, header: list, rows: Iterator[list], out, sheet_name: str) -> None:
+    """見出しと行を1シートに書く（out はパスまたはファイルオブジェクト）"""
+    if engine == "xlsxwriter":
+        import xlsxwriter
+        wb = xlsxwriter.Workbook(out, {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            "remove_timezone": True,
+        })
+        ws = wb.add_worksheet(sheet_name)
+        ws.write_row(0, 0, header)
+        for r, row in enumerate(rows, start=1):
+            ws.write_row(r, 0, row)
+        wb.close()
+        return
+
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(out)